@@ -17,6 +17,7 @@ import numpy as np
 import os
 import pandas as pd
 import random
+from time import perf_counter
 
 
 class ExamSchedulingTool:
@@ -47,6 +48,22 @@ class ExamSchedulingTool:
         self.classroom_real_capacities = None
         self.empty_schedule = None
 
+        # Course data and slot table used by the genetic scheduler
+        self.course_ids = None
+        self.course_durations = None
+        self.course_shared_students = None
+        self.course_conflict_matrix = None
+        self.slot_list = None
+        self.slot_days = None
+        self.slot_starts = None
+        self.free_slots = None
+        self.blocked_days = None
+        self.blocked_starts = None
+        self.blocked_ends = None
+
+        # Allowed days of each course in the multilevel mode
+        self.course_days = None
+
         self.all_student_numbers = self.class_list["StudentID"].unique().tolist()
         self.all_professor_names = self.class_list["Professor Name"].unique().tolist()
 
@@ -58,6 +75,7 @@ class ExamSchedulingTool:
         self.BIG_CLASSROOM_THRESHOLD = self.classroom_real_capacities["Capacity"].max()
         self.init_empty_schedule()
         self.init_blocked_hours()
+        self.init_course_matrices()
 
     def read_input_files(self, class_list_file_path, classroom_capacities_file_path):
         """
@@ -187,6 +205,86 @@ class ExamSchedulingTool:
                 time = pd.to_datetime(time, format="%H.%M") + pd.DateOffset(minutes=30)
                 time = time.strftime("%H.%M")
 
+    def init_course_matrices(self):
+        """
+        Initializes the course ids, exam durations, shared students and the course conflict matrix
+        """
+
+        # Keep the same course order and exam durations as the rest of the tool
+        courses = self.class_list.drop_duplicates(subset="CourseID")
+        self.course_ids = courses["CourseID"].tolist()
+        self.course_durations = courses["ExamDuration(in mins)"].to_numpy(dtype=int)
+
+        # Student x course and professor x course incidence matrices
+        students = pd.crosstab(self.class_list["StudentID"], self.class_list["CourseID"])[self.course_ids].to_numpy() > 0
+        professors = pd.crosstab(self.class_list["Professor Name"], self.class_list["CourseID"])[self.course_ids].to_numpy() > 0
+
+        # Number of students and professors shared by each pair of courses
+        students = students.astype(int)
+        professors = professors.astype(int)
+        # The diagonal is the number of students of each course
+        self.course_shared_students = students.T @ students
+        self.course_conflict_matrix = self.course_shared_students + professors.T @ professors
+        np.fill_diagonal(self.course_conflict_matrix, 0)
+
+    def init_slot_table(self, schedule):
+        """
+        Initializes the slot table of the given schedule as numpy arrays
+
+        Parameters
+        ----------
+        schedule: dict
+            The schedule dictionary
+        """
+
+        self.slot_list = []
+        slot_days = []
+        slot_starts = []
+        free_slots = []
+        blocked_days = []
+        blocked_starts = []
+        blocked_ends = []
+
+        for day_idx, day in enumerate(schedule):
+            for time in schedule[day]:
+                start = self.time_to_minutes(time)
+                # Blocked hours stay in the schedule as occupied slots
+                if schedule[day][time]["course"] != "":
+                    blocked_days.append(day_idx)
+                    blocked_starts.append(start)
+                    blocked_ends.append(self.time_to_minutes(schedule[day][time]["end time"]))
+                else:
+                    free_slots.append(len(self.slot_list))
+
+                self.slot_list.append((day, time))
+                slot_days.append(day_idx)
+                slot_starts.append(start)
+
+        self.slot_days = np.array(slot_days)
+        self.slot_starts = np.array(slot_starts)
+        self.free_slots = np.array(free_slots)
+        self.blocked_days = np.array(blocked_days, dtype=int)
+        self.blocked_starts = np.array(blocked_starts, dtype=int)
+        self.blocked_ends = np.array(blocked_ends, dtype=int)
+
+    def time_to_minutes(self, time):
+        """
+        Returns the given time in minutes
+
+        Parameters
+        ----------
+        time: str
+            The time in the format of 'HH.MM'
+
+        Returns
+        -------
+        int
+            The minutes passed since 00.00
+        """
+
+        hours, minutes = time.split(".")
+        return int(hours) * 60 + int(minutes)
+
     def student_has_two_exams_at_same_time(self, student_id, course1, course2):
         """
         Returns True if the student has two exams at the same time on the same day
@@ -281,6 +379,37 @@ class ExamSchedulingTool:
         return self.class_list[self.class_list["CourseID"] == courseID]["CourseID"].count()
 
 
+    def get_empty_times(self, schedule, course):
+        """
+        Returns the empty days and times of the schedule that the given course can be moved to
+
+        In the multilevel mode the course can only be moved to its candidate days and the extra days.
+
+        Parameters
+        ----------
+        schedule: dict
+            The schedule dictionary
+        course: str
+            The course id
+
+        Returns
+        -------
+        empty_times: list
+            The (day, time) tuples of the empty times
+        """
+
+        days = list(schedule)
+        if self.course_days is not None:
+            days = [day for day in schedule if day in self.course_days[course] or day not in self.empty_schedule]
+
+        empty_times = [(day, time) for day in days for time in schedule[day] if schedule[day][time]["course"] == ""]
+
+        # If the days of the course are full, use all empty times
+        if len(empty_times) == 0:
+            empty_times = [(day, time) for day in schedule for time in schedule[day] if schedule[day][time]["course"] == ""]
+
+        return empty_times
+
     def first_random_state(self, schedule):
         """
         Creates the first random state of the schedule
@@ -300,11 +429,7 @@ class ExamSchedulingTool:
 
         for course in self.class_list["CourseID"].unique().tolist():
             # Get all empty times
-            empty_times = []
-            for day in temp_schedule:
-                for time in temp_schedule[day]:
-                    if temp_schedule[day][time]["course"] == "":
-                        empty_times.append((day, time))
+            empty_times = self.get_empty_times(temp_schedule, course)
 
             # Get random empty day and time to move course to
             idx = np.random.choice(len(empty_times))
@@ -339,7 +464,27 @@ class ExamSchedulingTool:
                 if schedule[day][time]["course"] != "":
                     print(schedule[day][time]["course"], day, time, schedule[day][time]["end time"])
 
-    def cost(self, schedule):
+    def save_schedule(self, schedule, schedule_file_path='exam_schedule.csv'):
+        """
+        Saves the schedule to a CSV file that can be checked with ScheduleValidator.py
+
+        Parameters
+        ----------
+        schedule: dict
+            The schedule dictionary
+        schedule_file_path: str
+            The path of the schedule file (default: 'exam_schedule.csv')
+        """
+
+        rows = []
+        for day in schedule:
+            for time in schedule[day]:
+                if schedule[day][time]["course"] != "":
+                    rows.append([schedule[day][time]["course"], day, time, schedule[day][time]["end time"], schedule[day][time]["room"]])
+
+        pd.DataFrame(rows, columns=["CourseID", "Day", "Start Time", "End Time", "Room"]).to_csv(schedule_file_path, index=False)
+
+    def cost(self, schedule, days=None):
         """
         Returns the cost of the given schedule based on the constraints
 
@@ -347,6 +492,8 @@ class ExamSchedulingTool:
         ----------
         schedule: dict
             The schedule dictionary
+        days: list
+            The days to check, the cost of a schedule is the sum of the costs of its days (default: None - all days)
 
         Returns
         -------
@@ -356,10 +503,13 @@ class ExamSchedulingTool:
 
         cost = 0
 
+        if days is None:
+            days = list(schedule)
+
         # Default mode
         if not self.conflict:
             # Check if a course time is overlapping with another course
-            for day in schedule:
+            for day in days:
                 for time in schedule[day]:
                     if schedule[day][time]["course"] != "":
                         end_time = schedule[day][time]["end time"]
@@ -373,7 +523,7 @@ class ExamSchedulingTool:
         if self.conflict:
             # Check all the students and if a student has more than one exam at the same time on the same day add 1 to cost
             # Also check all the professors and if a professor has more than one exam at the same time on the same day add 1 to cost
-            for day in schedule:
+            for day in days:
                 for time in schedule[day]:
                     if schedule[day][time]["course"] != "":
                         end_time = schedule[day][time]["end time"]
@@ -414,11 +564,7 @@ class ExamSchedulingTool:
 
         # Get random day and time to move course to
         # Get all empty times
-        empty_times = []
-        for day in old_schedule:
-            for time in old_schedule[day]:
-                if old_schedule[day][time]["course"] == "":
-                    empty_times.append((day, time))
+        empty_times = self.get_empty_times(old_schedule, random_course)
 
         # Get random empty day and time to move course to
         idx = np.random.choice(len(empty_times))
@@ -448,9 +594,11 @@ class ExamSchedulingTool:
 
         return original_schedule
 
-    def simulated_annealing_scheduler(self, temp_max, temp_min, cooling_rate, max_iter, K=1, add_extra_day_after_iter=1000):
+    def simulated_annealing_steps(self, temp_max, temp_min, cooling_rate, max_iter, K=1, add_extra_day_after_iter=1000):
         """
-        Simulated annealing scheduler
+        Simulated annealing scheduler as a generator that yields the progress of the search
+
+        The caller can stop the search at any time, e.g. after ten seconds, and use the best schedule found so far.
 
         Parameters
         ----------
@@ -466,36 +614,59 @@ class ExamSchedulingTool:
             The K value (default: 1)
         add_extra_day_after_iter: int
             The iteration number to add an extra day to the schedule (default: 1000)
-        
-        Returns
-        -------
-        schedule: dict
-            The schedule dictionary that contains the courses, rooms and times. It is the final schedule.
+
+        Yields
+        ------
+        step: dict
+            The statistics of the search with the keys
+            "event": "start" for the first random schedule (first step), "improved" if a better schedule is found,
+            "found" if a schedule without faults is found (last step), "temperature" after each temperature update
+            or "extra day" if an extra day is added to the schedule
+            "iteration", "temperature", "cost", "best cost", "elapsed time" (in seconds) and
+            "schedule": a copy of the best schedule found so far (the final schedule for the "found" event),
+            each step has its own copy so it can be changed by the caller
         """
 
-        print("\n\nStarting simulated annealing scheduler...\n")
+        start_time = perf_counter()
 
         schedule = self.first_random_state(self.empty_schedule)
-        old_cost = self.cost(schedule)
+
+        # The cost of a schedule is the sum of the costs of its days and a move changes at most two days,
+        # so only the changed days are checked again
+        day_costs = {day: self.cost(schedule, [day]) for day in schedule}
+        old_cost = sum(day_costs.values())
+        best_cost = old_cost
+        best_schedule = copy.deepcopy(schedule)
         iter_num = 0
         flag_day_added = False
-        
+
         temperature = temp_max
-        # While temperature is higher than minimum temperature
-        while temperature >= temp_min:
+
+        def step(event, iteration):
+            return {"event": event, "iteration": iteration, "temperature": temperature, "cost": old_cost,
+                    "best cost": best_cost, "elapsed time": perf_counter() - start_time, "schedule": copy.deepcopy(best_schedule)}
+
+        yield step("start", 0)
+
+        # While temperature is higher than minimum temperature - a zero temperature (e.g. after underflow) stops the search
+        while temperature >= temp_min and temperature > 0:
             # While iteration number is lower than max iteration
             for i in range(max_iter):
                 # Get the successor move
                 schedule_before_update = self.successor_move(schedule)
                 # Calculate the cost of the new schedule
-                new_cost = self.cost(schedule)
+                new_day_costs = dict(day_costs)
+                for day in self.get_changed_days(schedule_before_update, schedule):
+                    new_day_costs[day] = self.cost(schedule, [day])
+                new_cost = sum(new_day_costs.values())
 
                 # If cost is 0 then return the schedule
                 if new_cost == 0:
-                    total = iter_num + i
-                    print(f"Found in {total}. iteration")
-                    return schedule
-                
+                    old_cost = best_cost = new_cost
+                    best_schedule = schedule
+                    yield step("found", iter_num + i)
+                    return
+
                 # Calculate delta
                 delta = new_cost - old_cost
                 if delta >= 0:
@@ -505,23 +676,100 @@ class ExamSchedulingTool:
                     # Accept the bad move
                     else:
                         old_cost = new_cost
+                        day_costs = new_day_costs
                 # If delta is negative then accept the move
                 else:
                     old_cost = new_cost
+                    day_costs = new_day_costs
+
+                # Keep a copy of the best schedule found so far
+                if old_cost < best_cost:
+                    best_cost = old_cost
+                    best_schedule = copy.deepcopy(schedule)
+                    yield step("improved", iter_num + i)
 
             # Update the iteration number and temperature
             iter_num += max_iter
             temperature *= cooling_rate
 
-            # Print the iteration number and cost
-            if iter_num % 50 == 0:
-                print("Iteration: ", iter_num, "Fault Score: ", old_cost)
+            yield step("temperature", iter_num)
 
             # If could not find a solution with 6 days, add an extra day
             if iter_num > add_extra_day_after_iter and not flag_day_added:
-                print(f"Could not find a solution with 6 days after {add_extra_day_after_iter} iterations. Adding an extra day...")
                 flag_day_added = True
                 self.add_extra_day(schedule)
+                yield step("extra day", iter_num)
+
+    def get_changed_days(self, old_schedule, new_schedule):
+        """
+        Returns the days whose courses are different in the given schedules
+
+        Parameters
+        ----------
+        old_schedule: dict
+            The schedule dictionary before the move
+        new_schedule: dict
+            The schedule dictionary after the move
+
+        Returns
+        -------
+        list
+            The changed days
+        """
+
+        changed_days = []
+        for day in new_schedule:
+            if day not in old_schedule:
+                changed_days.append(day)
+            elif any(new_schedule[day][time]["course"] != old_schedule[day][time]["course"] for time in new_schedule[day]):
+                changed_days.append(day)
+
+        return changed_days
+
+    def simulated_annealing_scheduler(self, temp_max, temp_min, cooling_rate, max_iter, K=1, add_extra_day_after_iter=1000):
+        """
+        Simulated annealing scheduler
+
+        Parameters
+        ----------
+        temp_max: float
+            The maximum temperature
+        temp_min: float
+            The minimum temperature
+        cooling_rate: float
+            The cooling rate
+        max_iter: int
+            The maximum iteration number for each temperature
+        K: int
+            The K value (default: 1)
+        add_extra_day_after_iter: int
+            The iteration number to add an extra day to the schedule (default: 1000)
+        
+        Returns
+        -------
+        schedule: dict
+            The schedule dictionary that contains the courses, rooms and times. It is the final schedule or the best schedule found
+            if there is no schedule without faults.
+        """
+
+        print("\n\nStarting simulated annealing scheduler...\n")
+
+        for step in self.simulated_annealing_steps(temp_max, temp_min, cooling_rate, max_iter, K, add_extra_day_after_iter):
+            # If cost is 0 then return the schedule
+            if step["event"] == "found":
+                print(f"Found in {step['iteration']}. iteration")
+                return step["schedule"]
+
+            # Print the iteration number and cost
+            if step["event"] == "temperature" and step["iteration"] % 50 == 0:
+                print("Iteration: ", step["iteration"], "Fault Score: ", step["cost"])
+
+            if step["event"] == "extra day":
+                print(f"Could not find a solution with 6 days after {add_extra_day_after_iter} iterations. Adding an extra day...")
+
+        # Temperature is lower than minimum temperature, return the best schedule found
+        print(f"Could not find a schedule without faults after {step['iteration']} iterations. Fault Score: {step['best cost']}")
+        return step["schedule"]
 
     def add_extra_day(self, schedule):
         """
@@ -540,8 +788,426 @@ class ExamSchedulingTool:
         while time != "18.30":
             schedule["Sunday"][time] = {"course": "", "room": "", "end time":""}
             time = pd.to_datetime(time, format="%H.%M") + pd.DateOffset(minutes=30)
-            time = time.strftime("%H.%M")  
-            
+            time = time.strftime("%H.%M")
+
+    def population_cost(self, population):
+        """
+        Returns the costs of all the schedules in the given population in one batched pass
+
+        It gives the same cost as the cost function for the schedule of each row.
+
+        Parameters
+        ----------
+        population: numpy.ndarray
+            The (population x courses) matrix of slot indexes
+
+        Returns
+        -------
+        costs: numpy.ndarray
+            The cost of each schedule in the population
+        """
+
+        days = self.slot_days[population]
+        starts = self.slot_starts[population]
+        ends = starts + self.course_durations
+
+        # overlaps[p, i, j] is True if course j starts while course i continues on the same day
+        overlaps = ((days[:, :, None] == days[:, None, :])
+                    & (starts[:, :, None] < starts[:, None, :])
+                    & (starts[:, None, :] < ends[:, :, None]))
+
+        # If user let the program for exam conflicts, only shared students and professors are counted
+        if self.conflict:
+            return (overlaps * self.course_conflict_matrix).sum(axis=(1, 2))
+
+        costs = overlaps.sum(axis=(1, 2))
+
+        # Blocked hours are checked like the other courses in the schedule
+        if len(self.blocked_starts) > 0:
+            same_day = days[:, :, None] == self.blocked_days
+            # A blocked hour starts while a course continues
+            costs += (same_day & (starts[:, :, None] < self.blocked_starts) & (self.blocked_starts < ends[:, :, None])).sum(axis=(1, 2))
+            # A course starts while a blocked hour continues
+            costs += (same_day & (self.blocked_starts < starts[:, :, None]) & (starts[:, :, None] < self.blocked_ends)).sum(axis=(1, 2))
+            # Blocked hours overlapping with each other
+            costs += ((self.blocked_days[:, None] == self.blocked_days)
+                      & (self.blocked_starts[:, None] < self.blocked_starts)
+                      & (self.blocked_starts < self.blocked_ends[:, None])).sum()
+
+        return costs
+
+    def repair_population(self, population):
+        """
+        Moves the courses that share a slot with another course to random empty slots
+
+        Parameters
+        ----------
+        population: numpy.ndarray
+            The (population x courses) matrix of slot indexes, updated in place
+        """
+
+        for individual in population:
+            _, first_idx = np.unique(individual, return_index=True)
+            duplicated = np.setdiff1d(np.arange(len(individual)), first_idx)
+            if len(duplicated) == 0:
+                continue
+
+            # Get all empty slots of this schedule
+            empty_slots = np.setdiff1d(self.free_slots, individual)
+            individual[duplicated] = np.random.choice(empty_slots, len(duplicated), replace=False)
+
+    def local_search(self, individual, steps):
+        """
+        Improves the given schedule by moving single courses to their best empty slots
+
+        Parameters
+        ----------
+        individual: numpy.ndarray
+            The slot indexes of the courses, updated in place
+        steps: int
+            The number of courses to try to move
+        """
+
+        for _ in range(steps):
+            # Get random course to move
+            course_idx = np.random.choice(len(individual))
+            # Try the course at its current slot and at all empty slots
+            candidate_slots = np.append(individual[course_idx], np.setdiff1d(self.free_slots, individual))
+
+            candidates = np.repeat(individual[None, :], len(candidate_slots), axis=0)
+            candidates[:, course_idx] = candidate_slots
+            individual[course_idx] = candidate_slots[np.argmin(self.population_cost(candidates))]
+
+    def slots_to_schedule(self, individual):
+        """
+        Converts the slot indexes of the courses to a schedule dictionary
+
+        Parameters
+        ----------
+        individual: numpy.ndarray
+            The slot indexes of the courses
+
+        Returns
+        -------
+        schedule: dict
+            The schedule dictionary
+        """
+
+        schedule = copy.deepcopy(self.empty_schedule)
+
+        for course, duration, slot in zip(self.course_ids, self.course_durations, individual):
+            day, time = self.slot_list[slot]
+            schedule[day][time]["course"] = course
+            # Add exam duration to time to get end time
+            end_time = pd.to_datetime(time, format="%H.%M") + pd.DateOffset(minutes=int(duration))
+            schedule[day][time]["end time"] = end_time.strftime("%H.%M")
+
+        return schedule
+
+    def genetic_scheduler(self, population_size, generations, mutation_rate, elite_size=2, tournament_size=3, local_search_steps=0):
+        """
+        Genetic scheduler with optional local search refinement (memetic algorithm)
+
+        Every schedule is encoded as the slot indexes of the courses and the whole population is evaluated with population_cost.
+
+        Parameters
+        ----------
+        population_size: int
+            The number of schedules in the population
+        generations: int
+            The maximum generation number
+        mutation_rate: float
+            The probability of moving a course to a random slot
+        elite_size: int
+            The number of best schedules copied to the next generation (default: 2)
+        tournament_size: int
+            The number of schedules competing to be a parent (default: 3)
+        local_search_steps: int
+            The number of local search moves applied to the elite schedules in each generation (default: 0)
+
+        Returns
+        -------
+        schedule: dict
+            The schedule dictionary that contains the courses, rooms and times. It is the best schedule found.
+        """
+
+        print("\n\nStarting genetic scheduler...\n")
+
+        # Check the validity of the parameters
+        if population_size < 1 or generations < 0 or not 0 <= mutation_rate <= 1:
+            print("Invalid population size, generation number or mutation rate. Exiting the program...")
+            exit(1)
+
+        if not 0 <= elite_size <= population_size or tournament_size < 1 or local_search_steps < 0:
+            print("Elite size should be between 0 and the population size, tournament size should be at least 1 and local search steps should not be negative. Exiting the program...")
+            exit(1)
+
+        self.init_slot_table(self.empty_schedule)
+        num_courses = len(self.course_ids)
+
+        if num_courses > len(self.free_slots):
+            print("Not enough empty slots to schedule all the courses. Exiting the program...")
+            exit(1)
+
+        # First random population - every course gets a different empty slot
+        population = np.array([np.random.choice(self.free_slots, num_courses, replace=False) for _ in range(population_size)])
+        costs = self.population_cost(population)
+
+        for generation in range(generations):
+            order = np.argsort(costs)
+            population = population[order]
+            costs = costs[order]
+
+            # Refine the elite schedules with local search
+            if local_search_steps > 0:
+                for individual in population[:elite_size]:
+                    self.local_search(individual, local_search_steps)
+                costs[:elite_size] = self.population_cost(population[:elite_size])
+
+            # If cost is 0 then return the schedule
+            best = np.argmin(costs)
+            if costs[best] == 0:
+                print(f"Found in {generation}. generation")
+                return self.slots_to_schedule(population[best])
+
+            # Print the generation number and cost
+            if generation % 50 == 0:
+                print("Generation: ", generation, "Fault Score: ", costs[best])
+
+            num_children = population_size - elite_size
+
+            # Tournament selection of the parents
+            tournaments = np.random.randint(population_size, size=(2, num_children, tournament_size))
+            winners = np.argmin(costs[tournaments], axis=2)
+            parents = np.take_along_axis(tournaments, winners[:, :, None], axis=2)[:, :, 0]
+
+            # Uniform crossover
+            mask = np.random.random((num_children, num_courses)) < 0.5
+            children = np.where(mask, population[parents[0]], population[parents[1]])
+
+            # Mutation - move courses to random empty slots
+            mutation = np.random.random(children.shape) < mutation_rate
+            children[mutation] = np.random.choice(self.free_slots, mutation.sum())
+            self.repair_population(children)
+
+            population = np.concatenate([population[:elite_size], children])
+            costs = np.concatenate([costs[:elite_size], self.population_cost(children)])
+
+        best = np.argmin(costs)
+        print(f"Could not find a schedule without faults after {generations} generations. Fault Score: {costs[best]}")
+        return self.slots_to_schedule(population[best])
+
+    def get_course_cohorts(self, shared_threshold=0.5):
+        """
+        Clusters the courses into cohorts of the same year level with heavily shared students
+
+        Two courses of the same year are in the same cohort if the ratio of their shared students to the students of the smaller course
+        is at least shared_threshold.
+
+        Parameters
+        ----------
+        shared_threshold: float
+            The minimum ratio of the shared students (default: 0.5)
+
+        Returns
+        -------
+        cohorts: list
+            The course indexes of each cohort
+        """
+
+        num_students = np.diag(self.course_shared_students)
+        shared_ratio = self.course_shared_students / np.minimum(num_students[:, None], num_students[None, :])
+
+        # Year level of the courses, e.g. 1. year courses start with 1
+        years = np.array([self.get_first_occured_digit(course) or "0" for course in self.course_ids])
+        linked = (shared_ratio >= shared_threshold) & (years[:, None] == years[None, :])
+
+        # Connected courses get the same label - the smallest course index in the cohort
+        labels = np.arange(len(self.course_ids))
+        while True:
+            new_labels = np.where(linked, labels[None, :], len(labels)).min(axis=1)
+            new_labels = np.minimum(labels, new_labels)
+            if np.array_equal(new_labels, labels):
+                break
+            labels = new_labels
+
+        return [np.flatnonzero(labels == label) for label in np.unique(labels)]
+
+    def schedule_cohorts(self, cohorts):
+        """
+        Assigns a set of days to each cohort - the coarse level of the multilevel scheduler
+
+        A cohort gets as many days as its courses (at most all the days) so that its courses can be spread over the days.
+        The days that share the fewest students and professors with the other cohorts on them and then the least loaded days are chosen.
+
+        Parameters
+        ----------
+        cohorts: list
+            The course indexes of each cohort
+
+        Returns
+        -------
+        cohort_days: list
+            The day indexes of each cohort
+        """
+
+        num_days = len(self.empty_schedule)
+
+        # Cohort x course membership matrix
+        membership = np.zeros((len(cohorts), len(self.course_ids)), dtype=int)
+        for cohort_idx, cohort in enumerate(cohorts):
+            membership[cohort_idx, cohort] = 1
+
+        # Exams take whole 30 minutes slots
+        exam_minutes = np.ceil(self.course_durations / 30).astype(int) * 30
+        cohort_minutes = membership @ exam_minutes
+        cohort_conflicts = membership @ self.course_conflict_matrix @ membership.T
+        np.fill_diagonal(cohort_conflicts, 0)
+
+        # Greedy assignment - the biggest cohorts first
+        cohort_days = [None] * len(cohorts)
+        day_cohorts = np.zeros((len(cohorts), num_days), dtype=int)
+        day_loads = np.zeros(num_days)
+        for cohort_idx in np.argsort(-cohort_minutes):
+            num_cohort_days = min(num_days, len(cohorts[cohort_idx]))
+            day_conflicts = cohort_conflicts[cohort_idx] @ day_cohorts
+
+            cohort_days[cohort_idx] = np.sort(np.lexsort((day_loads, day_conflicts))[:num_cohort_days])
+            day_cohorts[cohort_idx, cohort_days[cohort_idx]] = 1
+            # The load of the cohort is shared by its days
+            day_loads[cohort_days[cohort_idx]] += cohort_minutes[cohort_idx] / num_cohort_days
+
+        return cohort_days
+
+    def assign_course_days(self, cohorts, cohort_days, num_candidate_days=2, num_moves=1000):
+        """
+        Assigns candidate days to each course from the days of its cohort
+
+        The courses on the same day should fit in the day and share as few students and professors as possible,
+        so the courses of a cohort are spread over the days of the cohort. The best day of a course is its first candidate day.
+
+        Parameters
+        ----------
+        cohorts: list
+            The course indexes of each cohort
+        cohort_days: list
+            The day indexes of each cohort
+        num_candidate_days: int
+            The number of days that a course can be moved to by the simulated annealing (default: 2)
+        num_moves: int
+            The number of local search moves after the greedy assignment (default: 1000)
+
+        Returns
+        -------
+        course_days: dict
+            The candidate days of each course
+        """
+
+        days = list(self.empty_schedule)
+        day_capacities = np.array([sum(slot["course"] == "" for slot in self.empty_schedule[day].values()) for day in days]) * 30
+
+        exam_minutes = np.ceil(self.course_durations / 30).astype(int) * 30
+        num_students = np.diag(self.course_shared_students)
+
+        # Course x day matrix of the days of the cohort of each course
+        allowed = np.zeros((len(self.course_ids), len(days)), dtype=bool)
+        for cohort, cohort_day_idx in zip(cohorts, cohort_days):
+            allowed[np.ix_(cohort, cohort_day_idx)] = True
+
+        # Greedy assignment - the biggest cohorts first and the biggest courses of the cohort first
+        course_day_idx = np.full(len(self.course_ids), -1)
+        day_loads = np.zeros(len(days), dtype=int)
+        for cohort in sorted(cohorts, key=lambda cohort: -num_students[cohort].sum()):
+            cohort_day_used = np.zeros(len(days), dtype=bool)
+            for course_idx in cohort[np.argsort(-num_students[cohort])]:
+                assigned = course_day_idx >= 0
+                day_conflicts = np.bincount(course_day_idx[assigned], weights=self.course_conflict_matrix[course_idx, assigned], minlength=len(days))
+                fits = allowed[course_idx] & (day_loads + exam_minutes[course_idx] <= day_capacities)
+                candidates = np.flatnonzero(fits) if fits.any() else np.flatnonzero(allowed[course_idx])
+
+                # Least shared students and professors, then a day that the cohort does not use yet, then the least loaded day
+                day_idx = candidates[np.lexsort((day_loads[candidates], cohort_day_used[candidates], day_conflicts[candidates]))[0]]
+
+                course_day_idx[course_idx] = day_idx
+                cohort_day_used[day_idx] = True
+                day_loads[day_idx] += exam_minutes[course_idx]
+
+        # Move single courses to the days of their cohorts with less shared students and professors that they fit in
+        for _ in range(num_moves):
+            course_idx = np.random.choice(len(self.course_ids))
+            old_day = course_day_idx[course_idx]
+            day_conflicts = np.bincount(course_day_idx, weights=self.course_conflict_matrix[course_idx], minlength=len(days))
+            fits = allowed[course_idx] & (day_loads + exam_minutes[course_idx] <= day_capacities)
+            fits[old_day] = True
+
+            day_idx = np.flatnonzero(fits)[np.argmin(day_conflicts[fits])]
+            if day_conflicts[day_idx] < day_conflicts[old_day]:
+                course_day_idx[course_idx] = day_idx
+                day_loads[old_day] -= exam_minutes[course_idx]
+                day_loads[day_idx] += exam_minutes[course_idx]
+
+        # The assigned day first, then the other days of the cohort with the fewest shared students and professors
+        # with the courses that can be on that day - the biggest courses choose first
+        candidates = np.zeros((len(self.course_ids), len(days)), dtype=bool)
+        candidates[np.arange(len(self.course_ids)), course_day_idx] = True
+        for course_idx in np.argsort(-num_students):
+            for _ in range(min(num_candidate_days, allowed[course_idx].sum()) - 1):
+                day_conflicts = self.course_conflict_matrix[course_idx] @ candidates
+                free_days = np.flatnonzero(allowed[course_idx] & ~candidates[course_idx])
+                # Fewest shared students and professors, then the day with the fewest candidate courses
+                day_idx = free_days[np.lexsort((candidates.sum(axis=0)[free_days], day_conflicts[free_days]))[0]]
+                candidates[course_idx, day_idx] = True
+
+        course_days = {}
+        for course_idx, course in enumerate(self.course_ids):
+            other_days = [days[day_idx] for day_idx in np.flatnonzero(candidates[course_idx]) if day_idx != course_day_idx[course_idx]]
+            course_days[course] = [days[course_day_idx[course_idx]]] + other_days
+
+        return course_days
+
+    def multilevel_scheduler(self, temp_max, temp_min, cooling_rate, max_iter, K=1, add_extra_day_after_iter=1000, shared_threshold=0.5, num_candidate_days=2):
+        """
+        Multilevel scheduler that first assigns days to the cohorts of the courses, then spreads the courses of each cohort over its days
+        and finally places the exams in their candidate days with simulated annealing
+
+        Parameters
+        ----------
+        temp_max: float
+            The maximum temperature
+        temp_min: float
+            The minimum temperature
+        cooling_rate: float
+            The cooling rate
+        max_iter: int
+            The maximum iteration number for each temperature
+        K: int
+            The K value (default: 1)
+        add_extra_day_after_iter: int
+            The iteration number to add an extra day to the schedule (default: 1000)
+        shared_threshold: float
+            The minimum ratio of the shared students of the courses in the same cohort (default: 0.5)
+        num_candidate_days: int
+            The number of days that a course can be moved to by the simulated annealing (default: 2)
+
+        Returns
+        -------
+        schedule: dict
+            The schedule dictionary that contains the courses, rooms and times. It is the final schedule.
+        """
+
+        print("\n\nStarting multilevel scheduler...\n")
+
+        cohorts = self.get_course_cohorts(shared_threshold)
+        cohort_days = self.schedule_cohorts(cohorts)
+        self.course_days = self.assign_course_days(cohorts, cohort_days, num_candidate_days)
+        print(f"{len(self.course_ids)} courses are clustered into {len(cohorts)} cohorts")
+
+        try:
+            return self.simulated_annealing_scheduler(temp_max, temp_min, cooling_rate, max_iter, K, add_extra_day_after_iter)
+        finally:
+            # Back to the default mode, also if the scheduler is interrupted
+            self.course_days = None
+
     def set_free_all_classrooms(self):
         """
         Sets all classrooms to free
@@ -704,9 +1370,32 @@ def print_welcome_message():
     os.system('cls||clear')
     print("---------------------------------- WELCOME TO THE EXAM SCHEDULER TOOL --------------------------------\n")
 
+def select_scheduler():
+    """
+    Asks the user which scheduler to run
+
+    Returns
+    -------
+    str
+        "1" for the simulated annealing scheduler, "2" for the genetic scheduler, "3" for the multilevel scheduler
+    """
+
+    scheduler = input("\nSelect the scheduler:\n1 - Simulated annealing (default)\n2 - Genetic algorithm\n3 - Multilevel (cohorts first, then simulated annealing)\n\nPress Enter to use the default scheduler: ").strip()
+
+    # If user presses Enter then use the default scheduler
+    if scheduler == "":
+        return "1"
+
+    # Check if the input is valid
+    if scheduler not in ["1", "2", "3"]:
+        print("Invalid scheduler: ", scheduler, "\nExiting the program...")
+        exit(1)
+
+    return scheduler
+
 def main():
     """
-    The main function of the program that runs the scheduler tool with simulated annealing algorithm and prints the schedule to the console in a readable format 
+    The main function of the program that runs the selected scheduler of the scheduler tool and prints the schedule to the console in a readable format 
     """
 
     # Print welcome message
@@ -723,10 +1412,31 @@ def main():
     K = 1
     add_extra_day_after_iter = 1000
 
-    # Start the simulated annealing scheduler
-    schedule = scheduler_tool.simulated_annealing_scheduler(temp_max, temp_min, cooling_rate, max_iter, K, add_extra_day_after_iter)
+    # Set the parameters for the genetic algorithm
+    population_size = 200
+    generations = 500
+    mutation_rate = 0.02
+    elite_size = 2
+    tournament_size = 3
+    local_search_steps = 3
+
+    # Set the parameters for the multilevel scheduler
+    shared_threshold = 0.5
+    num_candidate_days = 2
+
+    scheduler = select_scheduler()
+
+    # Start the selected scheduler
+    if scheduler == "2":
+        schedule = scheduler_tool.genetic_scheduler(population_size, generations, mutation_rate, elite_size, tournament_size, local_search_steps)
+    elif scheduler == "3":
+        schedule = scheduler_tool.multilevel_scheduler(temp_max, temp_min, cooling_rate, max_iter, K, add_extra_day_after_iter, shared_threshold, num_candidate_days)
+    else:
+        schedule = scheduler_tool.simulated_annealing_scheduler(temp_max, temp_min, cooling_rate, max_iter, K, add_extra_day_after_iter)
     # Set the classrooms to the courses
     scheduler_tool.set_up_exam_classrooms(schedule)
+    # Save the schedule so that it can be checked with ScheduleValidator.py after manual edits
+    scheduler_tool.save_schedule(schedule)
     # Print the schedule to the console in a readable format
     print(scheduler_tool.get_schedule_as_table(schedule))
 
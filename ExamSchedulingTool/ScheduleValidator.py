@@ -0,0 +1,478 @@
+"""
+Schedule Validator for the Exam Scheduling Tool
+
+Checks a schedule file that is produced by ExamSchedulingTool.py or edited by hand
+and writes a report of all the hard and soft violations.
+
+Usage: python ScheduleValidator.py exam_schedule.csv [--class-list student_exam_list.csv] [--classrooms classroom_and_capacities.csv] [--report violation_report.csv]
+"""
+
+
+import argparse
+import numpy as np
+import pandas as pd
+
+
+# Days and 30 minutes slots of the default schedule, Sunday is the extra day
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+FIRST_START_TIME = "09.00"
+LAST_START_TIME = "18.00"
+SLOT_MINUTES = 30
+
+# The last start time of the default schedule is 18.00, exams should end until 18.30
+DAY_END_TIME = "18.30"
+
+REPORT_COLUMNS = ["Severity", "Violation", "CourseID", "Other CourseID", "Day", "Time", "Subject", "Detail"]
+
+
+class ScheduleValidator:
+    """
+    Schedule Validator class that finds the violations of a schedule with vectorized checks
+    """
+
+    def __init__(self, schedule_file_path='exam_schedule.csv', class_list_file_path='student_exam_list.csv', classroom_capacities_file_path='classroom_and_capacities.csv'):
+        """
+        Initializes the ScheduleValidator object with the given schedule and input files
+
+        Parameters
+        ----------
+        schedule_file_path: str
+            The path of the schedule file (default: 'exam_schedule.csv')
+        class_list_file_path: str
+            The path of the class list file (default: 'student_exam_list.csv')
+        classroom_capacities_file_path: str
+            The path of the classroom capacities file (default: 'classroom_and_capacities.csv')
+
+        Returns
+        -------
+        ScheduleValidator object
+            The ScheduleValidator object with the exams and blocked hours of the given schedule
+        """
+
+        self.schedule, self.class_list, self.classroom_capacity_list = self.read_input_files(schedule_file_path, class_list_file_path, classroom_capacities_file_path)
+
+        # Same real capacities as the scheduler - half of the original capacities
+        self.classroom_real_capacities = dict(zip(self.classroom_capacity_list["RoomID"], (self.classroom_capacity_list["Capacity"] / 2).astype(int)))
+
+        self.schedule["Start"] = self.schedule["Start Time"].map(self.time_to_minutes)
+        self.schedule["File End"] = self.schedule["End Time"].map(self.time_to_minutes)
+
+        # The end of an exam is its start plus the exam duration in the class list, the end time in the file may be wrong after an edit
+        durations = self.class_list.drop_duplicates(subset="CourseID").set_index("CourseID")["ExamDuration(in mins)"]
+        self.schedule["End"] = (self.schedule["Start"] + self.schedule["CourseID"].map(durations)).fillna(self.schedule["File End"])
+        self.schedule["File End Time"] = self.schedule["End Time"]
+        self.schedule["End Time"] = self.schedule["End"].map(self.minutes_to_time)
+
+        # Blocked hours are saved in the schedule as 'BLOCKED BY course_id'
+        blocked = self.schedule["CourseID"].str.startswith("BLOCKED BY")
+        self.exams = self.schedule[~blocked].reset_index(drop=True)
+        self.blocked_hours = self.schedule[blocked].reset_index(drop=True)
+
+    def read_input_files(self, schedule_file_path, class_list_file_path, classroom_capacities_file_path):
+        """
+        Reads the schedule and input files and returns the dataframes of the files
+
+        Parameters
+        ----------
+        schedule_file_path: str
+            The path of the schedule file
+        class_list_file_path: str
+            The path of the class list file
+        classroom_capacities_file_path: str
+            The path of the classroom capacities file
+
+        Returns
+        -------
+        schedule: pandas.DataFrame
+            The dataframe of the schedule file
+        class_list: pandas.DataFrame
+            The dataframe of the class list file
+        classroom_capacity_list: pandas.DataFrame
+            The dataframe of the classroom capacities file
+        """
+
+        # Check if the files exist
+        try:
+            # Read as strings, otherwise the times like 09.00 are read as numbers
+            schedule = pd.read_csv(schedule_file_path, dtype=str, keep_default_na=False)
+            class_list = pd.read_csv(class_list_file_path)
+            classroom_capacity_list = pd.read_csv(classroom_capacities_file_path)
+        except:
+            print("Required CSV files for Schedule validator could not be found. Exiting the program...")
+            exit(1)
+
+        return schedule, class_list, classroom_capacity_list
+
+    def time_to_minutes(self, time):
+        """
+        Returns the given time in minutes
+
+        Parameters
+        ----------
+        time: str
+            The time in the format of 'HH.MM'
+
+        Returns
+        -------
+        float
+            The minutes passed since 00.00, NaN if the time is not valid - it is reported as an invalid start or end time
+        """
+
+        try:
+            hours, minutes = time.strip().split(".")
+            return int(hours) * 60 + int(minutes)
+        except:
+            return np.nan
+
+    def minutes_to_time(self, minutes):
+        """
+        Returns the given minutes as time
+
+        Parameters
+        ----------
+        minutes: float
+            The minutes passed since 00.00
+
+        Returns
+        -------
+        str
+            The time in the format of 'HH.MM', empty if the minutes are NaN
+        """
+
+        if pd.isna(minutes):
+            return ""
+
+        minutes = int(minutes)
+        return f"{minutes // 60:02d}.{minutes % 60:02d}"
+
+    def make_violations(self, severity, violation, rows, detail):
+        """
+        Returns the violations in the report format
+
+        Parameters
+        ----------
+        severity: str
+            'hard' or 'soft'
+        violation: str
+            The name of the violation
+        rows: pandas.DataFrame
+            The violating rows with the columns of the report that are known
+        detail: str or pandas.Series
+            The detail message of each violation
+
+        Returns
+        -------
+        pandas.DataFrame
+            The violations with all the report columns
+        """
+
+        violations = rows.copy()
+        violations["Severity"] = severity
+        violations["Violation"] = violation
+        violations["Detail"] = detail
+
+        return violations.reindex(columns=REPORT_COLUMNS, fill_value="")
+
+    def exam_pairs(self, starts, ends, days, other_starts, other_ends, other_days, same_table):
+        """
+        Returns the index pairs of the exams that are on the same day and overlapping in time
+
+        Parameters
+        ----------
+        starts, ends, days: numpy.ndarray
+            The start minutes, end minutes and days of the first exams
+        other_starts, other_ends, other_days: numpy.ndarray
+            The start minutes, end minutes and days of the second exams
+        same_table: bool
+            True if both of the exams are from the same table, each pair is returned once
+
+        Returns
+        -------
+        overlapping: tuple of numpy.ndarray
+            The index pairs of the overlapping exams
+        same_day: tuple of numpy.ndarray
+            The index pairs of the exams on the same day that are not overlapping
+        """
+
+        same_day = days[:, None] == other_days[None, :]
+        overlaps = same_day & (starts[:, None] < other_ends[None, :]) & (other_starts[None, :] < ends[:, None])
+
+        if same_table:
+            # Each pair once and an exam is not paired with itself
+            upper = np.triu(np.ones(same_day.shape, dtype=bool), k=1)
+            same_day &= upper
+            overlaps &= upper
+
+        return np.nonzero(overlaps), np.nonzero(same_day & ~overlaps)
+
+    def pair_frame(self, pairs):
+        """
+        Returns the given exam index pairs as a dataframe
+
+        Parameters
+        ----------
+        pairs: tuple of numpy.ndarray
+            The index pairs of the exams
+
+        Returns
+        -------
+        pandas.DataFrame
+            The course ids, day and time of the pairs
+        """
+
+        first = self.exams.iloc[pairs[0]].reset_index(drop=True)
+        second = self.exams.iloc[pairs[1]].reset_index(drop=True)
+
+        return pd.DataFrame({
+            "CourseID": first["CourseID"],
+            "Other CourseID": second["CourseID"],
+            "Day": first["Day"],
+            "Time": first["Start Time"] + "-" + first["End Time"] + " / " + second["Start Time"] + "-" + second["End Time"],
+        })
+
+    def shared_subjects(self, pairs, incidence, subject_column):
+        """
+        Returns a row for each subject (student, professor or room) that both of the exams in a pair have
+
+        Parameters
+        ----------
+        pairs: pandas.DataFrame
+            The exam pairs from pair_frame
+        incidence: pandas.DataFrame
+            The CourseID and subject columns
+        subject_column: str
+            The name of the subject column
+
+        Returns
+        -------
+        pandas.DataFrame
+            The pairs joined with the shared subjects
+        """
+
+        incidence = incidence[["CourseID", subject_column]].drop_duplicates()
+        shared = pairs.merge(incidence, on="CourseID")
+        shared = shared.merge(incidence.rename(columns={"CourseID": "Other CourseID"}), on=["Other CourseID", subject_column])
+
+        return shared.rename(columns={subject_column: "Subject"})
+
+    def grid_checks(self):
+        """
+        Returns the exams and blocked hours that are not on the days and times of the schedule and the exams with wrong end times
+
+        Returns
+        -------
+        list of pandas.DataFrame
+            The violations
+        """
+
+        rows = self.schedule.rename(columns={"Start Time": "Time"})
+
+        unknown_day = rows[~rows["Day"].isin(DAYS)]
+
+        first_start = self.time_to_minutes(FIRST_START_TIME)
+        last_start = self.time_to_minutes(LAST_START_TIME)
+        invalid_start = rows[rows["Start"].isna() | (rows["Start"] < first_start) | (rows["Start"] > last_start) | ((rows["Start"] - first_start) % SLOT_MINUTES != 0)]
+
+        # The end time in the file should be the start time plus the exam duration
+        invalid_end = rows[rows["File End"].isna() | (rows["File End"] != rows["End"]) | (rows["File End"] <= rows["Start"])]
+        detail = "End time in the file is '" + invalid_end["File End Time"] + "', expected '" + invalid_end["End Time"] + "'"
+
+        return [
+            self.make_violations("hard", "Unknown day", unknown_day, f"Day is not one of {', '.join(DAYS)}"),
+            self.make_violations("hard", "Invalid start time", invalid_start, f"Start time is not a {SLOT_MINUTES} minutes slot between {FIRST_START_TIME} and {LAST_START_TIME}"),
+            self.make_violations("hard", "Invalid end time", invalid_end, detail),
+        ]
+
+    def course_checks(self):
+        """
+        Returns the violations of the scheduled courses: unscheduled, unknown and duplicated courses
+
+        Returns
+        -------
+        list of pandas.DataFrame
+            The violations
+        """
+
+        all_courses = self.class_list["CourseID"].unique()
+        scheduled = self.exams["CourseID"]
+
+        unscheduled = pd.DataFrame({"CourseID": np.setdiff1d(all_courses, scheduled)})
+        unknown = self.exams[~scheduled.isin(all_courses)].rename(columns={"Start Time": "Time"})
+        duplicated = self.exams[scheduled.duplicated()].rename(columns={"Start Time": "Time"})
+
+        return [
+            self.make_violations("hard", "Unscheduled course", unscheduled, "Course is in the class list but not in the schedule"),
+            self.make_violations("hard", "Unknown course", unknown, "Course is in the schedule but not in the class list"),
+            self.make_violations("hard", "Duplicated course", duplicated, "Course is scheduled more than once"),
+        ]
+
+    def clash_checks(self):
+        """
+        Returns the student, professor and room clashes of the exams and students with more than one exam on the same day
+
+        Returns
+        -------
+        list of pandas.DataFrame
+            The violations
+        """
+
+        starts = self.exams["Start"].to_numpy()
+        ends = self.exams["End"].to_numpy()
+        days = self.exams["Day"].to_numpy()
+
+        overlapping, same_day = self.exam_pairs(starts, ends, days, starts, ends, days, same_table=True)
+        overlapping = self.pair_frame(overlapping)
+        same_day = self.pair_frame(same_day)
+
+        # Room ids of the exams - an exam can have more than one room like 'C111-C403'
+        rooms = self.exams[["CourseID", "Room"]].assign(Room=self.exams["Room"].str.split("-")).explode("Room")
+        rooms = rooms[rooms["Room"] != ""]
+
+        students = self.shared_subjects(overlapping, self.class_list, "StudentID")
+        professors = self.shared_subjects(overlapping, self.class_list, "Professor Name")
+        double_booked = self.shared_subjects(overlapping, rooms, "Room")
+        same_day_students = self.shared_subjects(same_day, self.class_list, "StudentID")
+
+        return [
+            self.make_violations("hard", "Student clash", students, "Student has two exams at the same time"),
+            self.make_violations("hard", "Professor clash", professors, "Professor has two exams at the same time"),
+            self.make_violations("hard", "Room double booking", double_booked, "Room is used by two exams at the same time"),
+            self.make_violations("soft", "Student exams on same day", same_day_students, "Student has more than one exam on the same day"),
+        ]
+
+    def capacity_checks(self):
+        """
+        Returns the exams whose rooms can not handle the number of students and the exams in unknown rooms
+
+        Returns
+        -------
+        list of pandas.DataFrame
+            The violations
+        """
+
+        rooms = self.exams[["CourseID", "Day", "Start Time", "Room"]].rename(columns={"Start Time": "Time"})
+        rooms = rooms.assign(Subject=rooms["Room"].str.split("-")).explode("Subject")
+        rooms = rooms[rooms["Subject"] != ""]
+
+        unknown_rooms = rooms[~rooms["Subject"].isin(self.classroom_real_capacities.keys())]
+
+        # Total real capacity of the rooms of each exam row, a course scheduled twice is checked for each row
+        rooms["Capacity"] = rooms["Subject"].map(self.classroom_real_capacities).fillna(0).astype(int)
+        capacities = rooms.groupby(level=0)["Capacity"].sum()
+        num_students = self.class_list.groupby("CourseID")["StudentID"].nunique()
+
+        exams = self.exams.rename(columns={"Start Time": "Time", "Room": "Subject"})
+        exams["Capacity"] = capacities.reindex(exams.index, fill_value=0).astype(int)
+        exams["Students"] = exams["CourseID"].map(num_students).fillna(0).astype(int)
+        overflow = exams[exams["Students"] > exams["Capacity"]]
+
+        detail = overflow["Students"].astype(str) + " students, room capacity " + overflow["Capacity"].astype(str)
+
+        return [
+            self.make_violations("hard", "Capacity overflow", overflow, detail),
+            self.make_violations("hard", "Unknown room", unknown_rooms, "Room is not in the classroom list"),
+        ]
+
+    def time_checks(self):
+        """
+        Returns the exams intruding the blocked hours and the exams ending after the end of the day
+
+        Returns
+        -------
+        list of pandas.DataFrame
+            The violations
+        """
+
+        exam_idx, blocked_idx = self.exam_pairs(
+            self.exams["Start"].to_numpy(), self.exams["End"].to_numpy(), self.exams["Day"].to_numpy(),
+            self.blocked_hours["Start"].to_numpy(), self.blocked_hours["End"].to_numpy(), self.blocked_hours["Day"].to_numpy(),
+            same_table=False)[0]
+
+        exams = self.exams.iloc[exam_idx].reset_index(drop=True)
+        blocked = self.blocked_hours.iloc[blocked_idx].reset_index(drop=True)
+        intrusions = pd.DataFrame({
+            "CourseID": exams["CourseID"],
+            "Other CourseID": blocked["CourseID"],
+            "Day": exams["Day"],
+            "Time": exams["Start Time"] + "-" + exams["End Time"] + " / " + blocked["Start Time"] + "-" + blocked["End Time"],
+        })
+
+        late = self.exams[self.exams["End"] > self.time_to_minutes(DAY_END_TIME)].rename(columns={"Start Time": "Time"})
+
+        return [
+            self.make_violations("hard", "Blocked hour intrusion", intrusions, "Exam is overlapping with blocked hours"),
+            self.make_violations("soft", "Late exam", late, f"Exam ends after {DAY_END_TIME}"),
+        ]
+
+    def validate(self):
+        """
+        Returns all the hard and soft violations of the schedule
+
+        Returns
+        -------
+        violations: pandas.DataFrame
+            The violations with the columns of the report
+        """
+
+        violations = self.grid_checks() + self.course_checks() + self.clash_checks() + self.capacity_checks() + self.time_checks()
+        violations = [v for v in violations if not v.empty]
+
+        if not violations:
+            return pd.DataFrame(columns=REPORT_COLUMNS)
+
+        return pd.concat(violations, ignore_index=True)
+
+    def get_summary(self, violations):
+        """
+        Returns the number of violations of each type in a readable format
+
+        Parameters
+        ----------
+        violations: pandas.DataFrame
+            The violations from validate
+
+        Returns
+        -------
+        general_message: str
+            The summary of the violations as a string
+        """
+
+        general_message = "\n------------------------------------------ VIOLATION SUMMARY -----------------------------------------\n"
+
+        if violations.empty:
+            general_message += " \t No violations found\n"
+        else:
+            counts = violations.groupby(["Severity", "Violation"], sort=False).size()
+            for (severity, violation), count in counts.items():
+                general_message += f" \t {severity} \t | \t {violation:<30} \t | \t {count}\n"
+
+        general_message += "------------------------------------------------------------------------------------------------------\n"
+
+        return general_message
+
+
+def main():
+    """
+    The main function of the program that validates the given schedule file and writes the violation report
+    """
+
+    parser = argparse.ArgumentParser(description="Checks an exam schedule and writes a report of the violations")
+    parser.add_argument("schedule", nargs="?", default="exam_schedule.csv", help="The schedule file (default: exam_schedule.csv)")
+    parser.add_argument("--class-list", default="student_exam_list.csv", help="The class list file (default: student_exam_list.csv)")
+    parser.add_argument("--classrooms", default="classroom_and_capacities.csv", help="The classroom capacities file (default: classroom_and_capacities.csv)")
+    parser.add_argument("--report", default="violation_report.csv", help="The report file (default: violation_report.csv)")
+    args = parser.parse_args()
+
+    validator = ScheduleValidator(args.schedule, args.class_list, args.classrooms)
+    violations = validator.validate()
+    violations.to_csv(args.report, index=False)
+
+    print(validator.get_summary(violations))
+    print(f"Detailed report is saved to {args.report}")
+
+    # Exit with an error code if there is any hard violation
+    if (violations["Severity"] == "hard").any():
+        exit(1)
+
+if __name__ == "__main__":
+    main()